@@ -1,9 +1,11 @@
 import inspect
+import os
 from contextlib import asynccontextmanager
 from types import TracebackType
-from typing import AsyncIterable, Iterable, Optional, Type, Union
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Type, Union
 
 import websockets
+from websockets import WebSocketClientProtocol
 
 from kilroy_ws_client_py_sdk.protocol import chat
 from kilroy_ws_client_py_sdk.receivers import (
@@ -22,12 +24,58 @@ from kilroy_ws_client_py_sdk.senders import (
 from kilroy_ws_client_py_sdk.types import JSON
 from kilroy_ws_client_py_sdk.utils import lead, untrail
 
+if os.environ.get("KILROY_WS_UVLOOP") == "1":
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        uvloop.install()
+
+_NULL_SENDER = NullSender()
+_SINGLE_SENDER = SingleSender()
+_STREAM_SENDER = StreamSender()
+_SINGLE_RECEIVER = SingleReceiver()
+_STREAM_RECEIVER = StreamReceiver()
+
 
 class Client:
-    def __init__(self, url: str, *args, **kwargs) -> None:
+    """WebSocket client for JSON message exchange.
+
+    Connections are opened with ``max_queue=None`` so receiving never
+    pauses the transport for backpressure; pass ``max_queue`` explicitly
+    to restore the default flow control of ``websockets``.
+
+    Setting the ``KILROY_WS_UVLOOP=1`` environment variable installs
+    uvloop as the event loop policy at import time if it is available.
+    """
+
+    def __init__(self, url: str, *args, reuse: bool = False, **kwargs) -> None:
         self._url = untrail(url)
         self._args = args
         self._kwargs = kwargs
+        self._reuse = reuse
+        self._pool: Dict[str, List[WebSocketClientProtocol]] = {}
+        self._url_cache: Dict[str, str] = {}
+
+    async def _acquire(self, url: str, **kwargs) -> WebSocketClientProtocol:
+        pool = self._pool.get(url)
+        while pool:
+            websocket = pool.pop()
+            if websocket.open:
+                return websocket
+            await websocket.close()
+        return await websockets.connect(
+            url, *self._args, **{"max_queue": None, **self._kwargs, **kwargs}
+        )
+
+    async def _release(
+        self, url: str, websocket: WebSocketClientProtocol
+    ) -> None:
+        if self._reuse and websocket.open:
+            self._pool.setdefault(url, []).append(websocket)
+        else:
+            await websocket.close()
 
     @asynccontextmanager
     async def call(
@@ -38,13 +86,19 @@ class Client:
         data: DataType,
         **kwargs,
     ) -> ReturnType:
-        url = self._url + lead(path)
-        async with websockets.connect(
-            url, *self._args, **{**self._kwargs, **kwargs}
-        ) as websocket:
+        url = self._url_cache.get(path)
+        if url is None:
+            url = self._url_cache[path] = self._url + lead(path)
+        websocket = await self._acquire(url, **kwargs)
+        try:
             async with chat(websocket) as chat_id:
                 sending = sender.send(websocket, chat_id, data)
-                chained = receiver.chain(sending, websocket, chat_id)
+                chained = receiver.chain(
+                    sending,
+                    websocket,
+                    chat_id,
+                    send_is_noop=isinstance(sender, NullSender),
+                )
                 try:
                     yield chained
                 finally:
@@ -52,23 +106,28 @@ class Client:
                         sending.close()
                     if inspect.iscoroutine(chained):
                         chained.close()
+        except BaseException:
+            await websocket.close()
+            raise
+        else:
+            await self._release(url, websocket)
 
     async def get(self, path: str, **kwargs) -> JSON:
         async with self.call(
-            path, NullSender(), SingleReceiver(), None, **kwargs
+            path, _NULL_SENDER, _SINGLE_RECEIVER, None, **kwargs
         ) as result:
             return await result
 
     async def subscribe(self, path: str, **kwargs) -> AsyncIterable[JSON]:
         async with self.call(
-            path, NullSender(), StreamReceiver(), None, **kwargs
+            path, _NULL_SENDER, _STREAM_RECEIVER, None, **kwargs
         ) as results:
             async for result in results:
                 yield result
 
     async def request(self, path: str, data: JSON, **kwargs) -> JSON:
         async with self.call(
-            path, SingleSender(), SingleReceiver(), data, **kwargs
+            path, _SINGLE_SENDER, _SINGLE_RECEIVER, data, **kwargs
         ) as result:
             return await result
 
@@ -79,7 +138,7 @@ class Client:
         **kwargs,
     ) -> JSON:
         async with self.call(
-            path, StreamSender(), SingleReceiver(), data, **kwargs
+            path, _STREAM_SENDER, _SINGLE_RECEIVER, data, **kwargs
         ) as result:
             return await result
 
@@ -87,7 +146,7 @@ class Client:
         self, path: str, data: JSON, **kwargs
     ) -> AsyncIterable[JSON]:
         async with self.call(
-            path, SingleSender(), StreamReceiver(), data, **kwargs
+            path, _SINGLE_SENDER, _STREAM_RECEIVER, data, **kwargs
         ) as results:
             async for result in results:
                 yield result
@@ -99,7 +158,7 @@ class Client:
         **kwargs,
     ) -> AsyncIterable[JSON]:
         async with self.call(
-            path, StreamSender(), StreamReceiver(), data, **kwargs
+            path, _STREAM_SENDER, _STREAM_RECEIVER, data, **kwargs
         ) as results:
             async for result in results:
                 yield result
@@ -113,4 +172,8 @@ class Client:
         exc: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> Optional[bool]:
+        for websockets_ in self._pool.values():
+            for websocket in websockets_:
+                await websocket.close()
+        self._pool.clear()
         return None
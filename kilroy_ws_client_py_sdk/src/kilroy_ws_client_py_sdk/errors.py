@@ -7,6 +7,8 @@ CONVERSATION_ERROR = ProtocolError("Received incompatible conversation id.")
 
 
 class AppError(Exception):
+    __slots__ = ("code", "reason")
+
     def __init__(self, code, reason):
         self.code = code
         self.reason = reason
@@ -2,7 +2,6 @@ from abc import ABC
 from typing import Literal, Optional
 from uuid import UUID, uuid4
 
-from humps import camelize
 from pydantic import BaseModel, Field
 
 from kilroy_ws_client_py_sdk.types import JSON
@@ -10,14 +9,14 @@ from kilroy_ws_client_py_sdk.types import JSON
 
 class BaseMessage(BaseModel, ABC):
     id: UUID = Field(default_factory=uuid4)
-    chat_id: UUID
+    chat_id: UUID = Field(..., alias="chatId")
 
     def json(self, *args, by_alias: bool = True, **kwargs) -> str:
         return super().json(*args, by_alias=by_alias, **kwargs)
 
     class Config:
         allow_population_by_field_name = True
-        alias_generator = camelize
+        copy_on_model_validation = "none"
 
 
 class StartMessage(BaseMessage):
@@ -41,7 +40,7 @@ class AppErrorMessage(BaseMessage):
 
 class ProtocolErrorMessage(BaseMessage):
     type: Literal["protocol-error"] = "protocol-error"
-    chat_id: Optional[UUID]
+    chat_id: Optional[UUID] = Field(None, alias="chatId")
     reason: str
 
 
@@ -1,9 +1,10 @@
+import asyncio
 from contextlib import asynccontextmanager
 from functools import partial
-from json import JSONDecodeError
-from typing import AsyncIterable, Iterable, Type, TypeVar, Union
+from typing import AsyncIterable, Iterable, List, Type, TypeVar, Union
 from uuid import UUID, uuid4
 
+import orjson
 import websockets
 from pydantic import ValidationError
 
@@ -27,20 +28,96 @@ from kilroy_ws_client_py_sdk.utils import asyncify
 
 MessageType = TypeVar("MessageType", bound=BaseMessage)
 
+SEND_BATCH_SIZE = 32
+SEND_BATCH_BYTES = 16384
+
+_MESSAGE_TYPES = {
+    "start": StartMessage,
+    "stop": StopMessage,
+    "data": DataMessage,
+    "stream-end": StreamEndMessage,
+    "protocol-error": ProtocolErrorMessage,
+    "app-error": AppErrorMessage,
+}
+
+
+def _compile_builder(message_type: Type[MessageType]):
+    # generate a parser specialized for the concrete message class, doing
+    # exactly the field lookups its schema requires and assembling the
+    # instance the way pydantic's construct() would, minus its generic
+    # bookkeeping; the wire strings are kept as-is, since parsing hex
+    # UUIDs per message is wasted work when all consumers only ever
+    # compare or echo them
+    if getattr(message_type, "__private_attributes__", None):
+        return message_type.construct
+
+    items = []
+    names = []
+    for name, field in message_type.__fields__.items():
+        if name == "type":
+            items.append(f"'type': {field.default!r}")
+            continue
+        names.append(name)
+        if field.required or field.default_factory is not None:
+            items.append(f"{name!r}: obj[{field.alias!r}]")
+        else:
+            items.append(
+                f"{name!r}: obj.get({field.alias!r}, {field.default!r})"
+            )
+
+    source = "\n".join(
+        (
+            "def build(obj, _cls=_cls, _new=_new, _setattr=_setattr):",
+            "    message = _new(_cls)",
+            "    _setattr(message, '__dict__', {%s})" % ", ".join(items),
+            "    _setattr(message, '__fields_set__', {%s})"
+            % ", ".join(map(repr, names)),
+            "    return message",
+        )
+    )
+    namespace = {
+        "_cls": message_type,
+        "_new": message_type.__new__,
+        "_setattr": object.__setattr__,
+    }
+    exec(source, namespace)
+    return namespace["build"]
+
+
+_BUILDERS = {cls: _compile_builder(cls) for cls in _MESSAGE_TYPES.values()}
+
+
+def construct_message(
+    message_type: Type[MessageType], obj: JSON
+) -> MessageType:
+    return _BUILDERS[message_type](obj)
+
+
+def decode_message(data: str) -> JSON:
+    # a frame that does not open a JSON object can be rejected from its
+    # first byte, without running the parser at all
+    if not data or data[0] not in ("{", 123):
+        raise INVALID_MESSAGE_ERROR
+    try:
+        obj = orjson.loads(data)
+        message_class = _MESSAGE_TYPES[obj["type"]]
+    except (orjson.JSONDecodeError, TypeError, KeyError) as e:
+        raise INVALID_MESSAGE_ERROR from e
+    if message_class is ProtocolErrorMessage:
+        raise ProtocolError(obj.get("reason"))
+    if message_class is AppErrorMessage:
+        raise AppError(code=obj.get("code"), reason=obj.get("reason"))
+    return obj
+
 
 def parse_message(data: str, message_type: Type[MessageType]) -> MessageType:
+    obj = decode_message(data)
+    if _MESSAGE_TYPES[obj["type"]] is not message_type:
+        raise INVALID_MESSAGE_ERROR
     try:
-        return message_type.parse_raw(data)
-    except ValidationError as e:
-        try:
-            error = ProtocolErrorMessage.parse_raw(data)
-            raise ProtocolError(str(error))
-        except ValidationError:
-            try:
-                error = AppErrorMessage.parse_raw(data)
-                raise AppError(code=error.code, reason=error.reason)
-            except ValidationError:
-                raise INVALID_MESSAGE_ERROR from e
+        return construct_message(message_type, obj)
+    except (KeyError, ValueError) as e:
+        raise INVALID_MESSAGE_ERROR from e
 
 
 parse_stop_message = partial(parse_message, message_type=StopMessage)
@@ -57,29 +134,48 @@ def create_data_message(chat_id: UUID, payload: JSON) -> DataMessage:
         raise ProtocolError("Can't create data message.") from e
 
 
-def serialize_data_message(message: DataMessage) -> str:
+def create_start_frame(chat_id: UUID) -> bytes:
+    return orjson.dumps(
+        {"id": str(uuid4()), "chatId": str(chat_id), "type": "start"}
+    )
+
+
+def create_stream_end_frame(chat_id: UUID) -> bytes:
+    return orjson.dumps(
+        {"id": str(uuid4()), "chatId": str(chat_id), "type": "stream-end"}
+    )
+
+
+def serialize_data_message(message: DataMessage) -> bytes:
     try:
-        return message.json()
-    except JSONDecodeError as e:
+        return orjson.dumps(
+            {
+                "id": str(message.id),
+                "chatId": str(message.chat_id),
+                "type": "data",
+                "payload": message.payload,
+            }
+        )
+    except orjson.JSONEncodeError as e:
         raise ProtocolError("Can't serialize data message.") from e
 
 
 async def send_start_message(
     websocket: websockets.WebSocketServerProtocol, chat_id: UUID
 ) -> None:
-    await websocket.send(StartMessage(chat_id=chat_id).json())
+    await websocket.send(create_start_frame(chat_id))
 
 
 async def receive_stop_message(
     websocket: websockets.WebSocketServerProtocol, chat_id: UUID
 ) -> StartMessage:
     message = parse_stop_message(await websocket.recv())
-    check_chat_id(message, chat_id)
+    check_chat_id(message, str(chat_id))
     return message
 
 
-def check_chat_id(message: BaseMessage, expected_id: UUID) -> None:
-    if message.chat_id != expected_id:
+def check_chat_id(message: BaseMessage, expected_id: str) -> None:
+    if str(message.chat_id) != expected_id:
         raise CONVERSATION_ERROR
 
 
@@ -87,26 +183,44 @@ async def receive_data_message(
     websocket: websockets.WebSocketServerProtocol, chat_id: UUID
 ) -> DataMessage:
     message = parse_data_message(await websocket.recv())
-    check_chat_id(message, chat_id)
+    check_chat_id(message, str(chat_id))
     return message
 
 
 async def receive_data_message_stream(
     websocket: websockets.WebSocketServerProtocol, chat_id: UUID
 ) -> AsyncIterable[DataMessage]:
-    async for data in websocket:
-        try:
-            message = parse_data_message(data)
-        except ProtocolError as e:
+    expected_id = str(chat_id)
+
+    # with flow control disabled the reader task is never paused, so any
+    # frames websockets has already buffered can be drained synchronously
+    # instead of paying an event-loop turn each
+    buffered = None
+    if getattr(websocket, "max_queue", 0) is None:
+        buffered = getattr(websocket, "messages", None)
+
+    while True:
+        if buffered:
+            data = buffered.popleft()
+        else:
             try:
-                message = parse_stream_end_message(data)
-            except ProtocolError:
-                raise e
+                data = await websocket.recv()
+            except websockets.ConnectionClosedOK:
+                return
 
-            check_chat_id(message, chat_id)
-            return
+        obj = decode_message(data)
+        tag = obj["type"]
+        if tag != "data" and tag != "stream-end":
+            raise INVALID_MESSAGE_ERROR
+
+        try:
+            message = construct_message(_MESSAGE_TYPES[tag], obj)
+        except (KeyError, ValueError) as e:
+            raise INVALID_MESSAGE_ERROR from e
+        check_chat_id(message, expected_id)
 
-        check_chat_id(message, chat_id)
+        if tag == "stream-end":
+            return
         yield message
 
 
@@ -120,18 +234,39 @@ async def send_data_message(
     await websocket.send(data)
 
 
+async def flush_frames(
+    websocket: websockets.WebSocketServerProtocol, frames: List[bytes]
+) -> None:
+    if not frames:
+        return
+    if len(frames) == 1:
+        await websocket.send(frames[0])
+    else:
+        await asyncio.gather(*(websocket.send(frame) for frame in frames))
+    frames.clear()
+
+
 async def send_data_message_stream(
     websocket: websockets.WebSocketServerProtocol,
     chat_id: UUID,
     payloads: Union[Iterable[JSON], AsyncIterable[JSON]],
+    batch_size: int = SEND_BATCH_SIZE,
+    batch_bytes: int = SEND_BATCH_BYTES,
 ) -> None:
+    frames: List[bytes] = []
+    size = 0
+
     async for payload in asyncify(payloads):
         message = create_data_message(chat_id, payload)
         data = serialize_data_message(message)
-        await websocket.send(data)
-
-    stream_end_message = StreamEndMessage(chat_id=chat_id)
-    await websocket.send(stream_end_message.json())
+        frames.append(data)
+        size += len(data)
+        if len(frames) >= batch_size or size >= batch_bytes:
+            await flush_frames(websocket, frames)
+            size = 0
+
+    frames.append(create_stream_end_frame(chat_id))
+    await flush_frames(websocket, frames)
 
 
 @asynccontextmanager
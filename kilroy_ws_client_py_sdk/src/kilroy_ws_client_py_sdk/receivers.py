@@ -17,6 +17,8 @@ ReturnType = TypeVar(
 
 
 class Receiver(ABC, Generic[ReturnType]):
+    __slots__ = ()
+
     @abstractmethod
     async def receive(
         self,
@@ -31,16 +33,20 @@ class Receiver(ABC, Generic[ReturnType]):
         sending: Coroutine,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
+        send_is_noop: bool = False,
     ) -> ReturnType:
         pass
 
 
 class NullReceiver(Receiver[Awaitable[None]]):
-    async def receive(
+    __slots__ = ()
+
+    def receive(
         self,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
     ) -> None:
+        # no I/O to do, so no coroutine to allocate
         return None
 
     async def chain(
@@ -48,11 +54,15 @@ class NullReceiver(Receiver[Awaitable[None]]):
         sending: Coroutine,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
+        send_is_noop: bool = False,
     ) -> None:
         await sending
+        return None
 
 
 class SingleReceiver(Receiver[Awaitable[JSON]]):
+    __slots__ = ()
+
     async def receive(
         self,
         websocket: websockets.WebSocketServerProtocol,
@@ -66,20 +76,21 @@ class SingleReceiver(Receiver[Awaitable[JSON]]):
         sending: Coroutine,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
+        send_is_noop: bool = False,
     ) -> JSON:
-        sending_task = asyncio.create_task(sending)
-        data = await self.receive(websocket, chat_id)
-
-        sending_task.cancel()
-        try:
-            await sending_task
-        except asyncio.CancelledError:
-            pass
+        if send_is_noop:
+            await sending
+            return await self.receive(websocket, chat_id)
 
+        _, data = await asyncio.gather(
+            sending, self.receive(websocket, chat_id)
+        )
         return data
 
 
 class StreamReceiver(Receiver[AsyncIterable[JSON]]):
+    __slots__ = ()
+
     async def receive(
         self,
         websocket: websockets.WebSocketServerProtocol,
@@ -93,7 +104,14 @@ class StreamReceiver(Receiver[AsyncIterable[JSON]]):
         sending: Coroutine,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
+        send_is_noop: bool = False,
     ) -> AsyncIterable[JSON]:
+        if send_is_noop:
+            await sending
+            async for data in self.receive(websocket, chat_id):
+                yield data
+            return
+
         sending_task = asyncio.create_task(sending)
 
         async for data in self.receive(websocket, chat_id):
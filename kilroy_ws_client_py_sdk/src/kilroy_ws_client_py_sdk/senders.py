@@ -5,6 +5,8 @@ from uuid import UUID
 import websockets
 
 from kilroy_ws_client_py_sdk.protocol import (
+    SEND_BATCH_BYTES,
+    SEND_BATCH_SIZE,
     send_data_message,
     send_data_message_stream,
 )
@@ -16,6 +18,8 @@ DataType = TypeVar(
 
 
 class Sender(ABC, Generic[DataType]):
+    __slots__ = ()
+
     @abstractmethod
     async def send(
         self,
@@ -27,6 +31,8 @@ class Sender(ABC, Generic[DataType]):
 
 
 class NullSender(Sender[None]):
+    __slots__ = ()
+
     async def send(
         self,
         websocket: websockets.WebSocketServerProtocol,
@@ -37,6 +43,8 @@ class NullSender(Sender[None]):
 
 
 class SingleSender(Sender[JSON]):
+    __slots__ = ()
+
     async def send(
         self,
         websocket: websockets.WebSocketServerProtocol,
@@ -47,10 +55,26 @@ class SingleSender(Sender[JSON]):
 
 
 class StreamSender(Sender[Union[Iterable[JSON], AsyncIterable[JSON]]]):
+    __slots__ = ("_batch_size", "_batch_bytes")
+
+    def __init__(
+        self,
+        batch_size: int = SEND_BATCH_SIZE,
+        batch_bytes: int = SEND_BATCH_BYTES,
+    ) -> None:
+        self._batch_size = batch_size
+        self._batch_bytes = batch_bytes
+
     async def send(
         self,
         websocket: websockets.WebSocketServerProtocol,
         chat_id: UUID,
         data: Union[Iterable[JSON], AsyncIterable[JSON]],
     ) -> None:
-        await send_data_message_stream(websocket, chat_id, data)
+        await send_data_message_stream(
+            websocket,
+            chat_id,
+            data,
+            batch_size=self._batch_size,
+            batch_bytes=self._batch_bytes,
+        )
@@ -1,24 +1,34 @@
-from typing import AsyncIterable, Iterable, TypeVar, Union
+from collections.abc import AsyncIterable as AsyncIterableABC
+from typing import AsyncIterable, AsyncIterator, Iterator, Iterable, TypeVar, Union
 
 T = TypeVar("T")
 
 
-async def asyncify(
+class _SyncAsyncIterator(AsyncIterator[T]):
+    def __init__(self, iterator: Iterator[T]) -> None:
+        self._iterator = iterator
+
+    def __aiter__(self) -> "_SyncAsyncIterator[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def asyncify(
     iterable: Union[Iterable[T], AsyncIterable[T]]
 ) -> AsyncIterable[T]:
-    try:
-        iter(iterable)
-    except TypeError:
-        async for item in iterable:
-            yield item
-    else:
-        for item in iterable:
-            yield item
+    if isinstance(iterable, AsyncIterableABC):
+        return iterable
+    return _SyncAsyncIterator(iter(iterable))
 
 
 def lead(path: str) -> str:
-    return path if path.startswith("/") else "/" + path
+    return "/" + path.lstrip("/")
 
 
 def untrail(url: str) -> str:
-    return url if not url.endswith("/") else url[:-1]
+    return url.rstrip("/")
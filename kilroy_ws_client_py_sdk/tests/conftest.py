@@ -1,8 +1,21 @@
+import asyncio
 import os
 from pathlib import Path
 
 import pytest
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
 
 @pytest.fixture(scope="session")
 def resources_dir() -> Path:
@@ -1,25 +1,19 @@
 import asyncio
+import struct
 from contextlib import asynccontextmanager
-from socket import socket
+from socket import SOL_SOCKET, SO_LINGER
 from typing import Awaitable, Callable, List
-from uuid import UUID
+from uuid import UUID, uuid4
 
+import orjson
 import pytest
 import pytest_asyncio
 import websockets
-from pydantic import ValidationError
 from websockets.exceptions import WebSocketException
 from websockets.legacy.server import WebSocketServerProtocol, serve
 
 from kilroy_ws_client_py_sdk import AppError, Client, JSON, ProtocolError
-from kilroy_ws_client_py_sdk.messages import (
-    AppErrorMessage,
-    DataMessage,
-    ProtocolErrorMessage,
-    StartMessage,
-    StopMessage,
-    StreamEndMessage,
-)
+from kilroy_ws_client_py_sdk.messages import StartMessage
 from kilroy_ws_client_py_sdk.protocol import parse_message
 
 
@@ -28,7 +22,18 @@ class TestServer:
         self, handler: Callable[[WebSocketServerProtocol], Awaitable[None]]
     ) -> None:
         self._host = "localhost"
-        self._server = serve(handler, self._host)
+        # the suite has no use for permessage-deflate, keepalive pings or
+        # a patient close handshake, so skip their setup per connection
+        self._server = serve(
+            handler,
+            self._host,
+            compression=None,
+            ping_interval=None,
+            ping_timeout=None,
+            close_timeout=0.1,
+        )
+        self._port = None
+        self._url = None
 
     @property
     def host(self) -> str:
@@ -36,24 +41,23 @@ class TestServer:
 
     @property
     def port(self) -> int:
-        return next(iter(self._server.ws_server.sockets)).getsockname()[1]
+        return self._port
 
     @property
     def url(self) -> str:
-        return f"ws://{self.host}:{self.port}"
+        return self._url
 
     async def __aenter__(self):
+        # serve() resolves only after the listening socket is bound, so no
+        # readiness probe is needed
         await self._server.__aenter__()
-        while True:
-            try:
-                async with websockets.connect(self.url):
-                    pass
-            except ConnectionError:
-                pass
-            except websockets.InvalidStatusCode:
-                break
-            else:
-                break
+        sockets = self._server.ws_server.sockets
+        for sock in sockets:
+            # accepted sockets inherit the option, so closes reset the
+            # connection instead of parking ports in TIME_WAIT
+            sock.setsockopt(SOL_SOCKET, SO_LINGER, struct.pack("ii", 1, 0))
+        self._port = next(iter(sockets)).getsockname()[1]
+        self._url = f"ws://{self._host}:{self._port}"
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
@@ -67,10 +71,47 @@ async def receive_start_message(
     return parse_message(data, StartMessage)
 
 
+def data_frame(chat_id: UUID, payload: JSON) -> bytes:
+    return orjson.dumps(
+        {
+            "id": str(uuid4()),
+            "chatId": str(chat_id),
+            "type": "data",
+            "payload": payload,
+        }
+    )
+
+
+def stream_end_frame(chat_id: UUID) -> bytes:
+    return orjson.dumps(
+        {"id": str(uuid4()), "chatId": str(chat_id), "type": "stream-end"}
+    )
+
+
 async def send_stop_message(
     websocket: websockets.WebSocketServerProtocol, chat_id: UUID
 ) -> None:
-    await websocket.send(StopMessage(chat_id=chat_id).json())
+    frame = orjson.dumps(
+        {"id": str(uuid4()), "chatId": str(chat_id), "type": "stop"}
+    )
+    await websocket.send(frame)
+
+
+def protocol_error_frame(reason: str) -> bytes:
+    return orjson.dumps({"type": "protocol-error", "reason": reason})
+
+
+# the app-error reply never varies and the client rejects it before any
+# id check, so one frame serves every connection
+APP_ERROR_FRAME = orjson.dumps(
+    {
+        "id": str(uuid4()),
+        "chatId": str(uuid4()),
+        "type": "app-error",
+        "code": 123,
+        "reason": "foo",
+    }
+)
 
 
 @asynccontextmanager
@@ -78,7 +119,7 @@ async def chat(websocket: websockets.WebSocketServerProtocol) -> UUID:
     try:
         start = await receive_start_message(websocket)
     except ProtocolError as e:
-        await websocket.send(ProtocolErrorMessage(reason=str(e)))
+        await websocket.send(protocol_error_frame(str(e)))
         return
 
     yield start.chat_id
@@ -86,29 +127,112 @@ async def chat(websocket: websockets.WebSocketServerProtocol) -> UUID:
     await send_stop_message(websocket, start.chat_id)
 
 
-@pytest.fixture
+async def drain_data_messages(
+    websocket: websockets.WebSocketServerProtocol,
+) -> None:
+    # the client sends compact orjson-encoded bytes, so the tag can be
+    # sniffed without decoding the whole frame
+    async for data in websocket:
+        if b'"type":"data"' not in data:
+            break
+
+
+async def send_data_frames(
+    websocket: websockets.WebSocketServerProtocol,
+    chat_id: UUID,
+    payloads: List[JSON],
+) -> None:
+    frames = [data_frame(chat_id, payload) for payload in payloads]
+    frames.append(stream_end_frame(chat_id))
+    await asyncio.gather(*(websocket.send(frame) for frame in frames))
+
+
+@pytest.fixture(scope="session")
 def busy_port() -> int:
-    s = socket()
-    s.bind(("", 0))
-    port = s.getsockname()[1]
-    yield port
-    s.close()
+    # privileged port nothing in the suite can listen on, so connecting
+    # is refused immediately without holding a socket open
+    return 1
 
 
-@pytest_asyncio.fixture
-async def error_message_server() -> TestServer:
+@pytest.fixture(scope="session")
+def payload() -> JSON:
+    return {"foo": "bar"}
+
+
+@pytest.fixture(scope="session")
+def payloads() -> List[JSON]:
+    return [{"foo": "bar"}, {"bar": "foo"}]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def working_server(payload: JSON, payloads: List[JSON]) -> TestServer:
+    async def handle_get(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await websocket.send(data_frame(chat_id, payload))
+
+    async def handle_subscribe(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await send_data_frames(websocket, chat_id, payloads)
+
+    async def handle_request(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await websocket.recv()
+        await websocket.send(data_frame(chat_id, payload))
+
+    async def handle_request_stream_in(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await drain_data_messages(websocket)
+        await websocket.send(data_frame(chat_id, payload))
+
+    async def handle_request_stream_out(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await websocket.recv()
+        await send_data_frames(websocket, chat_id, payloads)
+
+    async def handle_request_stream_in_out(
+        websocket: WebSocketServerProtocol, chat_id: UUID
+    ) -> None:
+        await drain_data_messages(websocket)
+        await send_data_frames(websocket, chat_id, payloads)
+
+    handlers = {
+        "/get": handle_get,
+        "/subscribe": handle_subscribe,
+        "/request": handle_request,
+        "/request_stream_in": handle_request_stream_in,
+        "/request_stream_out": handle_request_stream_out,
+        "/request_stream_in_out": handle_request_stream_in_out,
+    }
+
     async def handler(websocket: WebSocketServerProtocol) -> None:
         async with chat(websocket) as chat_id:
-            data = AppErrorMessage(
-                chat_id=chat_id, code=123, reason="foo"
-            ).json()
-            await websocket.send(data)
+            await handlers[websocket.path](websocket, chat_id)
+
+    async with TestServer(handler) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def client(working_server: TestServer) -> Client:
+    return Client(working_server.url, reuse=True, compression=None)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def error_message_server() -> TestServer:
+    async def handler(websocket: WebSocketServerProtocol) -> None:
+        async with chat(websocket):
+            await websocket.send(APP_ERROR_FRAME)
 
     async with TestServer(handler) as server:
         yield server
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def invalid_message_server() -> TestServer:
     async def handler(websocket: WebSocketServerProtocol) -> None:
         async with chat(websocket):
@@ -118,375 +242,123 @@ async def invalid_message_server() -> TestServer:
         yield server
 
 
-class TestGet:
-    @pytest.fixture
-    def payload(self) -> JSON:
-        return {"foo": "bar"}
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payload: JSON) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                data = DataMessage(chat_id=chat_id, payload=payload).json()
-                await websocket.send(data)
+async def consume(result) -> None:
+    if hasattr(result, "__aiter__"):
+        async for _ in result:
+            pass
+    else:
+        await result
+
+
+CALLS = [
+    pytest.param(lambda client: client.get("/"), id="get"),
+    pytest.param(lambda client: client.subscribe("/"), id="subscribe"),
+    pytest.param(lambda client: client.request("/", data={}), id="request"),
+    pytest.param(
+        lambda client: client.request_stream_in("/", data=[{}]),
+        id="request_stream_in",
+    ),
+    pytest.param(
+        lambda client: client.request_stream_out("/", data={}),
+        id="request_stream_out",
+    ),
+    pytest.param(
+        lambda client: client.request_stream_in_out("/", data=[{}]),
+        id="request_stream_in_out",
+    ),
+]
 
-        async with TestServer(handler) as server:
-            yield server
 
-    @pytest.mark.asyncio
+class TestGet:
     async def test_get_returns_correct_payload(
-        self, working_server: TestServer, payload: JSON
+        self, client: Client, payload: JSON
     ) -> None:
-        client = Client(working_server.url)
-        server_payload = await client.get("/")
+        server_payload = await client.get("/get")
         assert server_payload == payload
 
-    @pytest.mark.asyncio
-    async def test_get_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            client = Client(f"ws://localhost:{busy_port}")
-            await client.get("/")
-
-    @pytest.mark.asyncio
-    async def test_get_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            client = Client("foo")
-            await client.get("foo")
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_get_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            client = Client(error_message_server.url)
-            await client.get("/")
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_get_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            client = Client(invalid_message_server.url)
-            await client.get("/")
-
 
 class TestSubscribe:
-    @pytest.fixture
-    def payloads(self) -> List[JSON]:
-        return [{"foo": "bar"}, {"bar": "foo"}]
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payloads: List[JSON]) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                for payload in payloads:
-                    data = DataMessage(chat_id=chat_id, payload=payload).json()
-                    await websocket.send(data)
-                await websocket.send(StreamEndMessage(chat_id=chat_id).json())
-
-        async with TestServer(handler) as server:
-            yield server
-
-    @pytest.mark.asyncio
     async def test_subscribe_returns_correct_payloads(
-        self, working_server: TestServer, payloads: List[JSON]
+        self, client: Client, payloads: List[JSON]
     ) -> None:
-        client = Client(working_server.url)
-        server_payloads = [payload async for payload in client.subscribe("/")]
+        server_payloads = [
+            payload async for payload in client.subscribe("/subscribe")
+        ]
         assert server_payloads == payloads
 
-    @pytest.mark.asyncio
-    async def test_subscribe_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            client = Client(f"ws://localhost:{busy_port}")
-            async for _ in client.subscribe("/"):
-                pass
-
-    @pytest.mark.asyncio
-    async def test_subscribe_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            async for _ in Client("foo").subscribe("foo"):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_subscribe_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            async for _ in Client(error_message_server.url).subscribe("/"):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_subscribe_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            async for _ in Client(invalid_message_server.url).subscribe("/"):
-                pass
-
 
 class TestRequest:
-    @pytest.fixture
-    def payload(self) -> JSON:
-        return {"foo": "bar"}
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payload: JSON) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                await websocket.recv()
-                reply = DataMessage(chat_id=chat_id, payload=payload)
-                await websocket.send(reply.json())
-
-        async with TestServer(handler) as server:
-            yield server
-
-    @pytest.mark.asyncio
     async def test_request_returns_correct_payload(
-        self, working_server: TestServer, payload: JSON
+        self, client: Client, payload: JSON
     ) -> None:
-        client = Client(working_server.url)
-        reply_payload = await client.request("/", data={})
+        reply_payload = await client.request("/request", data={})
         assert reply_payload == payload
 
-    @pytest.mark.asyncio
-    async def test_request_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            await Client(f"ws://localhost:{busy_port}").request("/", data={})
-
-    @pytest.mark.asyncio
-    async def test_request_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            await Client("foo").request("/", data={})
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            await Client(error_message_server.url).request("/", data={})
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            client = Client(invalid_message_server.url)
-            await client.request("/", data={})
-
 
 class TestRequestStreamIn:
-    @pytest.fixture
-    def payload(self) -> JSON:
-        return {"foo": "bar"}
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payload: JSON) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                async for data in websocket:
-                    try:
-                        DataMessage.parse_raw(data)
-                    except ValidationError:
-                        break
-                reply = DataMessage(chat_id=chat_id, payload=payload)
-                await websocket.send(reply.json())
-
-        async with TestServer(handler) as server:
-            yield server
-
-    @pytest.mark.asyncio
     async def test_request_stream_in_returns_correct_payload(
-        self, working_server: TestServer, payload: JSON
+        self, client: Client, payload: JSON
     ) -> None:
-        client = Client(working_server.url)
-        reply_payload = await client.request_stream_in("/", data=[{}])
+        reply_payload = await client.request_stream_in(
+            "/request_stream_in", data=[{}]
+        )
         assert reply_payload == payload
 
-    @pytest.mark.asyncio
-    async def test_request_stream_in_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            client = Client(f"ws://localhost:{busy_port}")
-            await client.request_stream_in("/", data=[{}])
-
-    @pytest.mark.asyncio
-    async def test_request_stream_in_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            client = Client("foo")
-            await client.request_stream_in("/", data=[{}])
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_in_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            client = Client(error_message_server.url)
-            await client.request_stream_in("/", data=[{}])
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_in_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            client = Client(invalid_message_server.url)
-            await client.request_stream_in("/", data=[{}])
-
 
 class TestRequestStreamOut:
-    @pytest.fixture
-    def payloads(self) -> List[JSON]:
-        return [{"foo": "bar"}, {"bar": "foo"}]
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payloads: List[JSON]) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                await websocket.recv()
-                for payload in payloads:
-                    reply = DataMessage(chat_id=chat_id, payload=payload)
-                    await websocket.send(reply.json())
-                await websocket.send(StreamEndMessage(chat_id=chat_id).json())
-
-        async with TestServer(handler) as server:
-            yield server
-
-    @pytest.mark.asyncio
     async def test_request_stream_out_returns_correct_payloads(
-        self, working_server: TestServer, payloads: List[JSON]
+        self, client: Client, payloads: List[JSON]
     ) -> None:
         reply_payloads = [
             payload
-            async for payload in Client(working_server.url).request_stream_out(
-                "/", data={}
+            async for payload in client.request_stream_out(
+                "/request_stream_out", data={}
             )
         ]
         assert reply_payloads == payloads
 
-    @pytest.mark.asyncio
-    async def test_request_stream_out_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            async for _ in Client(
-                f"ws://localhost:{busy_port}"
-            ).request_stream_out("/", data={}):
-                pass
-
-    @pytest.mark.asyncio
-    async def test_request_stream_out_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            async for _ in Client("foo").request_stream_out("/", data={}):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_out_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            async for _ in Client(error_message_server.url).request_stream_out(
-                "/", data={}
-            ):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_out_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            client = Client(invalid_message_server.url)
-            async for _ in client.request_stream_out("/", data={}):
-                pass
-
 
 class TestRequestStreamInOut:
-    @pytest.fixture
-    def payloads(self) -> List[JSON]:
-        return [{"foo": "bar"}, {"bar": "foo"}]
-
-    @pytest_asyncio.fixture
-    async def working_server(self, payloads: List[JSON]) -> TestServer:
-        async def handler(websocket: WebSocketServerProtocol) -> None:
-            async with chat(websocket) as chat_id:
-                async for data in websocket:
-                    try:
-                        DataMessage.parse_raw(data)
-                    except ValidationError:
-                        break
-                for payload in payloads:
-                    reply = DataMessage(chat_id=chat_id, payload=payload)
-                    await websocket.send(reply.json())
-                await websocket.send(StreamEndMessage(chat_id=chat_id).json())
-
-        async with TestServer(handler) as server:
-            yield server
-
-    @pytest.mark.asyncio
-    async def test_request_stream_out_returns_correct_payloads(
-        self, working_server: TestServer, payloads: List[JSON]
+    async def test_request_stream_in_out_returns_correct_payloads(
+        self, client: Client, payloads: List[JSON]
     ) -> None:
-        client = Client(working_server.url)
         reply_payloads = [
             payload
-            async for payload in client.request_stream_in_out("/", data=[{}])
+            async for payload in client.request_stream_in_out(
+                "/request_stream_in_out", data=[{}]
+            )
         ]
         assert reply_payloads == payloads
 
-    @pytest.mark.asyncio
-    async def test_request_stream_in_out_raises_on_connection_refused(
-        self, busy_port: int
-    ) -> None:
-        # noinspection PyTypeChecker
-        with pytest.raises((OSError, asyncio.TimeoutError)):
-            client = Client(f"ws://localhost:{busy_port}")
-            async for _ in client.request_stream_in_out("/", data=[{}]):
-                pass
-
-    @pytest.mark.asyncio
-    async def test_request_stream_in_out_raises_on_invalid_uri(self) -> None:
-        with pytest.raises(WebSocketException):
-            client = Client("foo")
-            async for _ in client.request_stream_in_out("/", data=[{}]):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_in_out_raises_on_error_message(
-        self, error_message_server: TestServer
-    ) -> None:
-        with pytest.raises(AppError):
-            client = Client(error_message_server.url)
-            async for _ in client.request_stream_in_out("/", data=[{}]):
-                pass
-
-    # noinspection PyShadowingNames
-    @pytest.mark.asyncio
-    async def test_request_stream_in_out_raises_on_invalid_message(
-        self, invalid_message_server: TestServer
-    ) -> None:
-        with pytest.raises(ProtocolError):
-            client = Client(invalid_message_server.url)
-            async for _ in client.request_stream_in_out("/", data=[{}]):
-                pass
+
+@pytest.mark.parametrize("call", CALLS)
+async def test_raises_on_connection_refused(busy_port: int, call) -> None:
+    # noinspection PyTypeChecker
+    with pytest.raises((OSError, asyncio.TimeoutError)):
+        await asyncio.wait_for(
+            consume(call(Client(f"ws://localhost:{busy_port}"))), timeout=0.5
+        )
+
+
+@pytest.mark.parametrize("call", CALLS)
+async def test_raises_on_invalid_uri(call) -> None:
+    with pytest.raises(WebSocketException):
+        await consume(call(Client("foo")))
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize("call", CALLS)
+async def test_raises_on_error_message(
+    error_message_server: TestServer, call
+) -> None:
+    with pytest.raises(AppError):
+        await consume(call(Client(error_message_server.url)))
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize("call", CALLS)
+async def test_raises_on_invalid_message(
+    invalid_message_server: TestServer, call
+) -> None:
+    with pytest.raises(ProtocolError):
+        await consume(call(Client(invalid_message_server.url)))